@@ -1,18 +1,34 @@
 # Fixed imports
-from pxr import Usd, Sdf
+from pxr import Usd, Sdf, UsdGeom
+import itertools
 import logging
 import os
-from pyspark.sql import SparkSession
+import sys
+import numpy as np
+import pandas as pd
+from pyspark.sql import SparkSession, Window
 import pyspark.sql.functions as F
-from pyspark.sql.functions import col, udf, lit
-from pyspark.sql.types import StringType
-from thefuzz import fuzz
+from pyspark.sql.functions import col, lit, pandas_udf, broadcast
+from pyspark.sql.types import StringType, DoubleType, StructType, StructField
+from rapidfuzz import process, fuzz as rfuzz, utils
 
 class OpenUSDToolkit:
     """
     Toolkit for working with OpenUSD files in Microsoft Fabric
     """
 
+    @staticmethod
+    def _configure_spark(spark):
+        """Enable adaptive query execution and Arrow transfers for the toolkit's queries"""
+        settings = {
+            "spark.sql.adaptive.enabled": "true",
+            "spark.sql.adaptive.skewJoin.enabled": "true",
+            "spark.sql.adaptive.autoBroadcastJoinThreshold": str(100 * 1024 * 1024),
+            "spark.sql.execution.arrow.pyspark.enabled": "true",
+        }
+        for key, value in settings.items():
+            spark.conf.set(key, value)
+
     @staticmethod
     def flatten_value(value):
         """Helper function to flatten complex types like dictionaries and lists"""
@@ -24,10 +40,18 @@ class OpenUSDToolkit:
             return str(value)
         
     @staticmethod
-    def read_usd_metadata(spark, usd_file):
-        """Takes in a USD file and returns a DataFrame with metadata"""
+    def read_usd_metadata(spark, usd_file, load_payloads=True):
+        """Takes in a USD file and returns a DataFrame with metadata
+        Parameters:
+        - spark: SparkSession
+        - usd_file: Path to the USD file
+        - load_payloads: If False, open the stage without loading payloads. Faster on heavy
+          scenes, but Xforms with payloads and everything beneath them are skipped.
+        """
+        OpenUSDToolkit._configure_spark(spark)
+
         # Open the USD stage
-        stage = Usd.Stage.Open(usd_file, Usd.Stage.LoadAll)
+        stage = Usd.Stage.Open(usd_file, Usd.Stage.LoadAll if load_payloads else Usd.Stage.LoadNone)
 
         # Extract root layer metadata
         root_layer = stage.GetRootLayer()
@@ -45,30 +69,23 @@ class OpenUSDToolkit:
             "time_codes_per_second": stage.GetTimeCodesPerSecond(),
         }
 
-        # Extract metadata for prims where type is "Xform"
-        prim_metadata = {}
-        for prim in stage.Traverse():
-            if prim.GetTypeName() == "Xform":  # Only include "Xform" types
-                prim_metadata[prim.GetPath().pathString] = {"type": "Xform"}
+        # Collect the paths of prims where type is "Xform"
+        prim_paths = [prim.GetPath().pathString for prim in stage.Traverse() if prim.IsA(UsdGeom.Xform)]
 
-        # Prepare the data to be flattened
-        flattened_data = []
-        for asset_path, metadata_dict in prim_metadata.items():
-            flattened_data.append(("prim_metadata", asset_path, OpenUSDToolkit.flatten_value(metadata_dict)))
+        # Convert the paths into a DataFrame with an explicit schema to skip inference
+        schema = StructType([StructField("sourcePath", StringType())])
+        df = spark.createDataFrame([(path,) for path in prim_paths], schema=schema)
 
-        # Convert the flattened data into a DataFrame
-        df = spark.createDataFrame(flattened_data, ['metadata_type', 'metadata_key', 'metadata_value'])
+        # Derive the asset ID from the last path element
+        df_new = df.withColumn("USDAssetID", F.substring_index(F.col("sourcePath"), "/", -1))
 
-        # Drop unnecessary columns
-        df = df.drop("metadata_type", "metadata_value")
-
-        # Transform the DataFrame
-        df_new = df.withColumn("USDAssetID", F.split(F.col("metadata_key"), "/").getItem(F.size(F.split(F.col("metadata_key"), "/")) - 1)) \
-                .withColumnRenamed("metadata_key", "sourcePath")
-
-        # Write the DataFrame as a Delta table
+        # Write the DataFrame as a Delta table. Delta does not support bucketBy, so instead
+        # range partition by USDAssetID: each file then covers a narrow key range and its
+        # min/max statistics let lookups and joins on that key skip files
         table_name = "ExtractedUSDMetadata"
-        df_new.write.mode("overwrite").format("delta").saveAsTable(table_name)
+        df_new.repartitionByRange("USDAssetID") \
+              .sortWithinPartitions("USDAssetID") \
+              .write.mode("overwrite").format("delta").saveAsTable(table_name)
 
         # Return the transformed DataFrame
         return df_new
@@ -81,16 +98,16 @@ class OpenUSDToolkit:
         - dtbname: Name of DTB Item to query frpom
         - entityname: Name of Entity to retrieve list.  
         """
+        OpenUSDToolkit._configure_spark(spark)
+
         try:
-            # Query the entity instances from the DTB
-            query = f"""
-            SELECT ei.EntityInstanceDisplayId
-            FROM {dtbname}dtdm.entitytype et
-            JOIN {dtbname}dtdm.entityinstance ei
-            ON et.ID = ei.EntityTypeId
-            WHERE et.Name = '{entityname}'
-            """
-            df = spark.sql(query)
+            # Query the entity instances from the DTB, the entity name is passed as a
+            # literal so the filter is pushed down to the scan and never parsed as SQL
+            entity_types = spark.table(f"{dtbname}dtdm.entitytype").alias("et")
+            entity_instances = spark.table(f"{dtbname}dtdm.entityinstance").alias("ei")
+            df = entity_types.filter(col("et.Name") == lit(entityname)) \
+                             .join(entity_instances, col("et.ID") == col("ei.EntityTypeId")) \
+                             .select(col("ei.EntityInstanceDisplayId"))
 
             # Create a temporary view for SQL queries
             df.createOrReplaceTempView(entityname)
@@ -107,7 +124,7 @@ class OpenUSDToolkit:
             return None
         
     @staticmethod
-    def fuzzy_match_usd_assets(spark, df_usd_metadata, df_asset_data, asset_id_col="EntityInstanceDisplayId", threshold=80):
+    def fuzzy_match_usd_assets(spark, df_usd_metadata, df_asset_data, asset_id_col="EntityInstanceDisplayId", threshold=80, chunk_size=1000, workers=1):
         """
         Takes in two data frames and runs a fuzzy match on them.
         Allows dynamic specification of asset ID column names.
@@ -119,51 +136,159 @@ class OpenUSDToolkit:
         - usd_id_col: column in df_usd_metadata to match from (default "USDAssetID")
         - asset_id_col: column in df_asset_data to match to (default "AssetID")
         - threshold: minimum fuzzy match score to consider a valid match
+        - chunk_size: number of USD asset IDs scored at once, bounds the score matrix to chunk_size x candidates
+        - workers: threads rapidfuzz uses per Python worker, Spark already runs one worker per core
         """
+        OpenUSDToolkit._configure_spark(spark)
+
         # This is hardcoded by the read_usd_metadata function
         usd_id_col="USDAssetID"
 
-        # Collect the asset IDs from df_asset_data to the driver
-        asset_list = df_asset_data.select(asset_id_col).rdd.flatMap(lambda x: x).collect()
+        # Collect the asset IDs from df_asset_data to the driver, as strings so numeric ID columns can be matched
+        asset_list = df_asset_data.select(col(asset_id_col).cast("string")).rdd.flatMap(lambda x: x).collect()
         
-        # Broadcast the asset list
-        broadcast_assets = spark.sparkContext.broadcast(asset_list)
+        # Tokenize and sort the candidates once on the driver, broadcast as parallel
+        # arrays of original and normalized IDs so scoring never re-tokenizes them
+        asset_names = np.array([asset for asset in asset_list if asset is not None], dtype=object)
+        normed_assets = [OpenUSDToolkit._sort_tokens(asset) for asset in asset_names]
+        broadcast_assets = spark.sparkContext.broadcast((asset_names, normed_assets))
         
-        # Define the UDF to find best fuzzy match
-        def get_best_match(usd_asset_id):
-            best_match = None
-            best_score = 0
-            for candidate in broadcast_assets.value:
-                score = fuzz.token_sort_ratio(usd_asset_id, candidate)
-                if score > best_score:
-                    best_score = score
-                    best_match = candidate
-            return best_match if best_score >= threshold else None
-
-        fuzzy_udf = udf(get_best_match, StringType())
+        # Define the vectorized UDF to find the best fuzzy match for each batch
+        @pandas_udf(StringType())
+        def fuzzy_udf(usd_asset_ids: pd.Series) -> pd.Series:
+            candidates, normed_candidates = broadcast_assets.value
+            if len(candidates) == 0:
+                return pd.Series([None] * len(usd_asset_ids), dtype=object)
+
+            # Score the batch against every candidate in native code. With both
+            # sides token-sorted up front, a plain ratio equals token_sort_ratio.
+            # Scores are 0-100 so a uint8 matrix is enough and a quarter the size of float32,
+            # and scoring in row chunks keeps only one chunk's matrix in memory at a time.
+            queries = [OpenUSDToolkit._sort_tokens(usd_asset_id) for usd_asset_id in usd_asset_ids.fillna("")]
+            best_idx = np.zeros(len(queries), dtype=np.intp)
+            best_score = np.zeros(len(queries), dtype=np.uint8)
+            for start in range(0, len(queries), chunk_size):
+                scores = process.cdist(
+                    queries[start:start + chunk_size],
+                    normed_candidates,
+                    scorer=rfuzz.ratio,
+                    processor=None,
+                    score_cutoff=threshold,
+                    dtype=np.uint8,
+                    workers=workers
+                )
+                chunk_idx = scores.argmax(axis=1)
+                best_idx[start:start + len(chunk_idx)] = chunk_idx
+                best_score[start:start + len(chunk_idx)] = scores[np.arange(len(chunk_idx)), chunk_idx]
+
+            # Pick the matched names straight from the candidate array
+            matches = candidates[best_idx]
+            matches[(best_score < threshold) | usd_asset_ids.isna().to_numpy()] = None
+            return pd.Series(matches, index=usd_asset_ids.index)
 
         # Apply the UDF to create the match
         matched_df = df_usd_metadata.withColumn("DTBAssetID", fuzzy_udf(col(usd_id_col)))
 
-        # Get successful matches
+        # Get successful matches, cached so reporting and the caller score only once.
+        # The caller owns the cache and can release it with result_df.unpersist().
         result_df = matched_df.filter(col("DTBAssetID").isNotNull()) \
-                            .select(col(usd_id_col).alias("USDAssetID"), "DTBAssetID")
+                            .select(col(usd_id_col).alias("USDAssetID"), "DTBAssetID") \
+                            .cache()
 
         # Get non-matches
-        unmatched_df = matched_df.filter(col("DTBAssetID").isNull()) \
-                                .select(usd_id_col)
+        unmatched_df = df_usd_metadata.select(usd_id_col) \
+                                      .join(result_df, on=usd_id_col, how="left_anti")
+        
+        OpenUSDToolkit._print_unmatched(unmatched_df)
+
+        return result_df
+
+    @staticmethod
+    def jvm_fuzzy_match_usd_assets(spark, df_usd_metadata, df_asset_data, asset_id_col="EntityInstanceDisplayId", threshold=80, udf_class=None, udf_name="jaro_winkler", max_broadcast_rows=1000000):
+        """
+        Fuzzy match USD assets with a distributed cross join scored on the JVM.
+        Avoids the Python worker entirely, which is faster for large workloads.
+        Both sides are lowercased and punctuation is replaced by spaces before scoring, like
+        fuzzy_match_usd_assets does. Tokens are not reordered, so IDs whose words appear in a
+        different order score lower here than with token_sort_ratio.
         
-        # Collect and print unmatched USDAssetIDs
-        unmatched_list = unmatched_df.rdd.flatMap(lambda x: x).collect()
-        if unmatched_list:
-            print("⚠️ Unmatched USDAssetIDs:")
-            for asset in unmatched_list:
-                print(f" - {asset}")
+        Parameters:
+        - spark: SparkSession
+        - df_usd_metadata: DataFrame with USD metadata
+        - df_asset_data: DataFrame with asset information
+        - asset_id_col: column in df_asset_data to match to (default "EntityInstanceDisplayId")
+        - threshold: minimum similarity score (0-100) to consider a valid match
+        - udf_class: fully qualified Java class implementing a Jaro-Winkler UDF2<String, String, Double>.
+          Its JAR must be attached to the Spark session. If None, the built-in levenshtein function is used.
+        - udf_name: name to register the Java UDF under
+        - max_broadcast_rows: largest df_asset_data that is broadcast to the executors for the cross join
+        """
+        OpenUSDToolkit._configure_spark(spark)
+
+        # This is hardcoded by the read_usd_metadata function
+        usd_id_col="USDAssetID"
+
+        if udf_class:
+            # Register the JVM similarity function, it returns a score between 0 and 1
+            spark.udf.registerJavaFunction(udf_name, udf_class, DoubleType())
+            score_expr = F.expr(f"{udf_name}(usd_norm, asset_norm) * 100")
         else:
-            print("✅ All USDAssetIDs successfully matched.")
+            # Normalize the built-in edit distance to a 0-100 similarity score
+            max_length = F.greatest(F.length("usd_norm"), F.length("asset_norm"), lit(1))
+            score_expr = (lit(1) - F.levenshtein("usd_norm", "asset_norm") / max_length) * 100
+
+        # Normalize the IDs on both sides the same way utils.default_process does
+        df_usd_ids = df_usd_metadata.select(usd_id_col).distinct() \
+                                    .withColumn("usd_norm", OpenUSDToolkit._normalize_col(col(usd_id_col)))
+        df_asset_ids = df_asset_data.select(col(asset_id_col).cast("string").alias("DTBAssetID")) \
+                                    .withColumn("asset_norm", OpenUSDToolkit._normalize_col(col("DTBAssetID")))
+
+        # Broadcast the candidates unless they are too large to ship to every executor
+        if df_asset_ids.count() <= max_broadcast_rows:
+            df_asset_ids = broadcast(df_asset_ids)
+
+        # Score every distinct USD asset against the candidates and keep pairs above the threshold
+        pairs = df_usd_ids.crossJoin(df_asset_ids)
+        scored = pairs.withColumn("score", score_expr) \
+                      .filter(col("score") >= threshold)
+
+        # Keep the best scoring candidate per USDAssetID, ties go to the first DTBAssetID so
+        # every run picks the same match. Cached so reporting and the caller see the same result
+        # without re-running the cross join.
+        window = Window.partitionBy(usd_id_col).orderBy(F.desc("score"), F.asc("DTBAssetID"))
+        result_df = scored.withColumn("rank", F.row_number().over(window)) \
+                          .filter(col("rank") == 1) \
+                          .select(usd_id_col, "DTBAssetID") \
+                          .cache()
+
+        # Get non-matches
+        unmatched_df = df_usd_metadata.select(usd_id_col) \
+                                      .join(result_df, on=usd_id_col, how="left_anti")
+
+        OpenUSDToolkit._print_unmatched(unmatched_df)
 
         return result_df
 
+    @staticmethod
+    def _normalize_col(column):
+        """Lowercase a string column and replace runs of non-alphanumeric characters with a space"""
+        return F.trim(F.regexp_replace(F.lower(column), "[^0-9a-z]+", " "))
+
+    @staticmethod
+    def _sort_tokens(value):
+        """Normalize a string and sort its tokens, as token_sort_ratio does before scoring"""
+        return " ".join(sorted(utils.default_process(value).split()))
+
+    @staticmethod
+    def _print_unmatched(unmatched_df):
+        """Print unmatched USDAssetIDs without collecting them to the driver"""
+        unmatched_count = unmatched_df.count()
+        if unmatched_count:
+            print(f"⚠️ {unmatched_count} unmatched USDAssetIDs:")
+            unmatched_df.show(100, truncate=False)
+        else:
+            print("✅ All USDAssetIDs successfully matched.")
+
 
     @staticmethod
     def exact_match_usd_assets(df_usd_metadata, df_asset_data):
@@ -173,22 +298,36 @@ class OpenUSDToolkit:
         return None
         
     @staticmethod
-    def process_contextualization_job_results(dtdm_name, lakehouse_name):
-        """Process contextualization data from a specified DTDM and save results to a specified Lakehouse"""
+    def process_contextualization_job_results(dtdm_name, lakehouse_name, max_broadcast_rows=1000000):
+        """Process contextualization data from a specified DTDM and save results to a specified Lakehouse
+        Parameters:
+        - dtdm_name: Name of the DTDM to read entity and relationship instances from
+        - lakehouse_name: Name of the Lakehouse to save the ContextualizationResults table to
+        - max_broadcast_rows: largest entity instance table that is broadcast to the executors for the joins
+        """
         spark = SparkSession.builder.getOrCreate()
+        OpenUSDToolkit._configure_spark(spark)
+        entityInstanceDf = None
         
         try:
             # Query entity and relationship instances from the provided DTDM
-            entityInstanceDf = spark.sql(f"SELECT * FROM {dtdm_name}.entityinstance")
+            entityInstanceDf = spark.sql(f"SELECT Id1, Id2, EntityInstanceDisplayId FROM {dtdm_name}.entityinstance")
+            # Cache the entity instances since they are joined twice, and materialize them once.
+            # Only the join keys and display ID are kept so the cache holds no unused columns.
+            entityInstanceDf = entityInstanceDf.cache()
+            entity_count = entityInstanceDf.count()
             relationshipsDf = spark.sql(f"SELECT * FROM {dtdm_name}.relationshipinstance")
             
             # Create temporary views for SQL query
             relationshipsDf.createOrReplaceTempView("relationshipinstance")
             entityInstanceDf.createOrReplaceTempView("entityinstance")
             
-            # Execute query to map USD entities to asset entities
-            query = """
-            SELECT 
+            # Execute query to map USD entities to asset entities. Broadcasting the entity
+            # instances avoids shuffling the relationships twice, unless they are too large
+            # to ship to every executor, in which case AQE picks the join strategy.
+            hint = "/*+ BROADCAST(e1), BROADCAST(e2) */" if entity_count <= max_broadcast_rows else ""
+            query = f"""
+            SELECT {hint}
                 e1.EntityInstanceDisplayId AS USDDisplayID,
                 e2.EntityInstanceDisplayId AS AssetDisplayID
             FROM relationshipinstance r
@@ -216,50 +355,85 @@ class OpenUSDToolkit:
                 print(f"An error occurred: {str(e)}")
             return None
 
+        finally:
+            # Release the cached entity instances even if the query or write failed
+            if entityInstanceDf is not None:
+                entityInstanceDf.unpersist()
+
     @staticmethod
-    def enrich_usd_with_dtb_assets(usd_file_path, output_usd_file_path, df_usd_metadata, result_df):
-        """Enrich USD file with DTB_ID attributes based on fuzzy-matched results"""
+    def enrich_usd_with_dtb_assets(usd_file_path, output_usd_file_path, df_usd_metadata, result_df, max_broadcast_rows=1000000, batch_size=10000):
+        """Enrich USD file with DTB_ID attributes based on fuzzy-matched results
+        Parameters:
+        - usd_file_path: Path to the USD file to enrich
+        - output_usd_file_path: Path to save the enriched USD file to
+        - df_usd_metadata: DataFrame with USD metadata
+        - result_df: DataFrame with fuzzy-matched USDAssetID/DTBAssetID pairs
+        - max_broadcast_rows: largest result_df that is broadcast to the executors for the join
+        - batch_size: number of matches held on the driver and authored per Sdf change block
+        """
+        OpenUSDToolkit._configure_spark(df_usd_metadata.sparkSession)
+
+        # Broadcast the match results unless they are too large to ship to every executor
+        if result_df.count() <= max_broadcast_rows:
+            result_df = broadcast(result_df)
+
         # Join metadata and fuzzy match results
         df_matched = df_usd_metadata.join(
             result_df,
             on="USDAssetID",
             how="inner"
-        ).select("sourcePath", "USDAssetID", "DTBAssetID")
-
-        # Convert to Pandas for iteration
-        matched_assets = df_matched.toPandas()
+        ).select("sourcePath", "DTBAssetID")
 
         # Load the USD stage
         stage = Usd.Stage.Open(usd_file_path)
+        layer = stage.GetRootLayer()
 
+        # Stream the matches one partition at a time instead of collecting them all to the driver,
+        # and only hold batch_size of them at once
         count = 0
-        for _, row in matched_assets.iterrows():
-            prim_path = row["sourcePath"]
-            dtb_asset_id = row["DTBAssetID"]
-
-            prim = stage.GetPrimAtPath(prim_path)
-            if prim and prim.IsValid():
-                attr = prim.CreateAttribute("DTB_ID", Sdf.ValueTypeNames.String)
-                attr.Set(dtb_asset_id)
-                count += 1
-            else:
-                logging.warning(f"Invalid or missing prim at path: {prim_path}")
+        matches = df_matched.toLocalIterator(prefetchPartitions=True)
+        while True:
+            batch = list(itertools.islice(matches, batch_size))
+            if not batch:
+                break
+
+            # Keep only the path/ID pairs of prims that exist on the stage
+            valid_matches = []
+            for prim_path, dtb_asset_id in batch:
+                prim = stage.GetPrimAtPath(prim_path)
+                if prim and prim.IsValid():
+                    valid_matches.append((prim_path, dtb_asset_id))
+                else:
+                    logging.warning(f"Invalid or missing prim at path: {prim_path}")
+
+            # Author directly on the root layer inside a change block so the stage recomposes once per batch.
+            # Only Sdf calls happen inside the block, the composed stage is stale until it closes.
+            with Sdf.ChangeBlock():
+                for prim_path, dtb_asset_id in valid_matches:
+                    prim_spec = Sdf.CreatePrimInLayer(layer, prim_path)
+                    attr_spec = prim_spec.attributes.get("DTB_ID")
+                    if not attr_spec:
+                        attr_spec = Sdf.AttributeSpec(prim_spec, "DTB_ID", Sdf.ValueTypeNames.String, declaresCustom=True)
+                    attr_spec.default = dtb_asset_id
+            count += len(valid_matches)
 
         # Save modified USD file
-        stage.GetRootLayer().Export(output_usd_file_path)
+        layer.Export(output_usd_file_path)
         print(f"✅ Enriched USD file saved to: {output_usd_file_path}")
         print(f"🔧 Total prims enriched with DTB_ID: {count}")
 
     @staticmethod
-    def print_usd_file_details(usd_file_path, onlyDTBID=False):
+    def print_usd_file_details(usd_file_path, onlyDTBID=False, load_payloads=True):
         """Print detailed information about a USD file.
         
         Parameters:
         - usd_file_path: Path to the USD file.
         - onlyDTBID: If True, only print prims that have the 'DTB_ID' attribute.
+        - load_payloads: If False, open the stage without loading payloads. Faster on heavy
+          scenes, but Xforms with payloads and everything beneath them are skipped.
         """
         # Open the USD file
-        stage = Usd.Stage.Open(usd_file_path)
+        stage = Usd.Stage.Open(usd_file_path, Usd.Stage.LoadAll if load_payloads else Usd.Stage.LoadNone)
 
         if not stage:
             print(f"❌ Failed to open USD file at: {usd_file_path}")
@@ -269,46 +443,43 @@ class OpenUSDToolkit:
         print("-" * 100)
 
         # Filter prims of type 'Xform'
-        xform_prims = [prim for prim in stage.Traverse() if prim.GetTypeName() == "Xform"]
+        xform_prims = [prim for prim in stage.Traverse() if prim.IsA(UsdGeom.Xform)]
 
         if not xform_prims:
             print("⚠️ No 'Xform' prims found in the file.")
             return
 
         for prim in xform_prims:
-            attributes = prim.GetAttributes()
-            has_dtb_id = any(attr.GetName() == "DTB_ID" for attr in attributes)
-
             # If the onlyDTBID flag is set, skip prims without the DTB_ID attribute
-            if onlyDTBID and not has_dtb_id:
+            if onlyDTBID and not prim.HasAttribute("DTB_ID"):
                 continue
 
-            print(f"🔹 Prim Path: {prim.GetPath()}")
+            # Buffer each prim's block and write it in one call instead of a print per line
+            lines = [f"🔹 Prim Path: {prim.GetPath()}"]
 
             # Metadata
             metadata = prim.GetAllMetadata()
             if metadata:
-                print("📌 Metadata:")
-                for key, value in metadata.items():
-                    print(f"  - {key}: {value}")
+                lines.append("📌 Metadata:")
+                lines.extend(f"  - {key}: {value}" for key, value in metadata.items())
             else:
-                print("📌 Metadata: None")
+                lines.append("📌 Metadata: None")
 
             # Attributes
+            attributes = prim.GetAttributes()
             if attributes:
-                print("🔧 Attributes:")
-                for attr in attributes:
-                    print(f"  - {attr.GetName()} = {attr.Get()}")
+                lines.append("🔧 Attributes:")
+                lines.extend(f"  - {attr.GetName()} = {attr.Get()}" for attr in attributes)
             else:
-                print("🔧 Attributes: None")
+                lines.append("🔧 Attributes: None")
 
             # Relationships
             relationships = prim.GetRelationships()
             if relationships:
-                print("🔗 Relationships:")
-                for rel in relationships:
-                    print(f"  - {rel.GetName()} -> {rel.GetTargets()}")
+                lines.append("🔗 Relationships:")
+                lines.extend(f"  - {rel.GetName()} -> {rel.GetTargets()}" for rel in relationships)
             else:
-                print("🔗 Relationships: None")
+                lines.append("🔗 Relationships: None")
 
-            print("-" * 50)  # Separator for readability
+            lines.append("-" * 50)  # Separator for readability
+            sys.stdout.write("\n".join(lines) + "\n")
@@ -9,8 +9,10 @@ setup(
     packages=find_packages(),
     install_requires=[
         "pyspark>=3.3",
-        "fuzzywuzzy",
-        "python-Levenshtein", 
+        "rapidfuzz",
+        "numpy",
+        "pandas",
+        "pyarrow",
         "usd-core"
     ],
     python_requires=">=3.8",